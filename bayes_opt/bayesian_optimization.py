@@ -1,4 +1,5 @@
 import warnings
+from collections import deque
 
 from .target_space import TargetSpace
 from .event import Events, DEFAULT_EVENTS
@@ -10,8 +11,10 @@ from sklearn.gaussian_process import GaussianProcessRegressor
 
 
 class Queue:
+    __slots__ = ('_queue',)
+
     def __init__(self):
-        self._queue = []
+        self._queue = deque()
 
     @property
     def empty(self):
@@ -21,11 +24,10 @@ class Queue:
         return len(self._queue)
 
     def __next__(self):
-        if self.empty:
+        try:
+            return self._queue.popleft()
+        except IndexError:
             raise StopIteration("Queue is empty, no more objects to retrieve.")
-        obj = self._queue[0]
-        self._queue = self._queue[1:]
-        return obj
 
     def next(self):
         return self.__next__()
@@ -41,10 +43,15 @@ class Observable(object):
     Inspired/Taken from
         https://www.protechtraining.com/blog/post/879#simple-observer
     """
+    __slots__ = ('_events', '_callbacks')
+
     def __init__(self, events):
         # maps event names to subscribers
         # str -> dict
         self._events = {event: dict() for event in events}
+        # flat callback lists, rebuilt on (un)subscribe, iterated on dispatch
+        # str -> list
+        self._callbacks = {event: [] for event in events}
 
     def get_subscribers(self, event):
         return self._events[event]
@@ -53,12 +60,14 @@ class Observable(object):
         if callback is None:
             callback = getattr(subscriber, 'update')
         self.get_subscribers(event)[subscriber] = callback
+        self._callbacks[event] = list(self.get_subscribers(event).values())
 
     def unsubscribe(self, event, subscriber):
         del self.get_subscribers(event)[subscriber]
+        self._callbacks[event] = list(self.get_subscribers(event).values())
 
     def dispatch(self, event):
-        for _, callback in self.get_subscribers(event).items():
+        for callback in self._callbacks[event]:
             callback(event, self)
 
 
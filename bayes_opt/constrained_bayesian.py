@@ -1,17 +1,25 @@
 import warnings
+from collections import deque
+import numpy as np
 
 from .target_space import TargetSpace
 from .event import Events, DEFAULT_EVENTS
 from .logger import _get_default_logger
-from .util import UtilityFunction, acq_max, ensure_rng
+from .utility import UtilityFunction, acq_max, ensure_rng
+
+from .gaussian_process import CachedGaussianProcessRegressor
+
+from sklearn.gaussian_process.kernels import Matern
 
-from sklearn.gaussian_process.kernels import Matern, WhiteKernel
-from sklearn.gaussian_process import GaussianProcessRegressor
+# number of GP fits between two fits running the full set of restarts
+_FULL_FIT_PERIOD = 10
 
 
 class Queue:
+    __slots__ = ('_queue',)
+
     def __init__(self):
-        self._queue = []
+        self._queue = deque()
 
     @property
     def empty(self):
@@ -21,11 +29,10 @@ class Queue:
         return len(self._queue)
 
     def __next__(self):
-        if self.empty:
+        try:
+            return self._queue.popleft()
+        except IndexError:
             raise StopIteration("Queue is empty, no more objects to retrieve.")
-        obj = self._queue[0]
-        self._queue = self._queue[1:]
-        return obj
 
     def next(self):
         return self.__next__()
@@ -42,10 +49,15 @@ class Observable(object):
         https://www.protechtraining.com/blog/post/879#simple-observer
     """
 
+    __slots__ = ('_events', '_callbacks')
+
     def __init__(self, events):
         # maps event names to subscribers
         # str -> dict
         self._events = {event: dict() for event in events}
+        # flat callback lists, rebuilt on (un)subscribe, iterated on dispatch
+        # str -> list
+        self._callbacks = {event: [] for event in events}
 
     def get_subscribers(self, event):
         return self._events[event]
@@ -54,17 +66,17 @@ class Observable(object):
         if callback is None:
             callback = getattr(subscriber, "update")
         self.get_subscribers(event)[subscriber] = callback
+        self._callbacks[event] = list(self.get_subscribers(event).values())
 
     def unsubscribe(self, event, subscriber):
         del self.get_subscribers(event)[subscriber]
+        self._callbacks[event] = list(self.get_subscribers(event).values())
 
     def dispatch(self, event):
-        for _, callback in self.get_subscribers(event).items():
+        for callback in self._callbacks[event]:
             callback(event, self)
 
 
-
-from .utility import UtilityFunction, acq_max, ensure_rng
 class ConstrainedBayesianOptimization(Observable):
     """
     This class takes the function to optimize as well as the parameters bounds
@@ -105,6 +117,22 @@ class ConstrainedBayesianOptimization(Observable):
         Allows changing the lower and upper searching bounds
     """
 
+    __slots__ = (
+        "_tags",
+        "_random_state",
+        "_queue",
+        "_verbose",
+        "_bounds_transformer",
+        "_space",
+        "_gp",
+        "_probe_cache",
+        "_last_fit_n",
+        "_prev_theta",
+        "_n_fits",
+        "transformer_tag",
+        "bounds_transformer",
+    )
+
     def __init__(
         self, f, pbounds, random_state=None, verbose=2, bounds_transformer=None, tags=None
     ):
@@ -119,22 +147,22 @@ class ConstrainedBayesianOptimization(Observable):
         self._bounds_transformer = bounds_transformer
 
         self._space = {}
-        self._gp = {}
         self._bounds_transformer = {}
         for tag in self._tags:
             # Data structure containing the function to be optimized, the bounds of
             # its domain, and a record of the evaluations we have done so far
             self._space[tag] = TargetSpace(f, pbounds, random_state)
 
+        # Internal GP regressor, built by `_ensure_gp` once it is needed
+        self._gp = None
+        # targets already evaluated per tag, keyed by `_probe_key`
+        self._probe_cache = {}
 
-            # Internal GP regressor
-            self._gp[tag] = GaussianProcessRegressor(
-                kernel=Matern(nu=2.5) + WhiteKernel(noise_level=1e-3),
-                alpha=1e1,
-                normalize_y=True,
-                n_restarts_optimizer=5,
-                random_state=self._random_state,
-            )
+        # number of observations the GP was last fitted on
+        self._last_fit_n = -1
+        # kernel hyperparameters of the last fit, used to warm start the next
+        self._prev_theta = None
+        self._n_fits = 0
 
         if bounds_transformer:
             self.transformer_tag, self.bounds_transformer = bounds_transformer
@@ -162,6 +190,7 @@ class ConstrainedBayesianOptimization(Observable):
     def register(self, tag, params, target):
         """Expect observation with known target"""
         self._space[tag].register(params, target)
+        self._probe_cache.setdefault(self._probe_key(tag, params), {})[tag] = target
         self.dispatch(Events.OPTIMIZATION_STEP)
         if self._bounds_transformer:
             if self._transformer_tag == tag:
@@ -184,33 +213,122 @@ class ConstrainedBayesianOptimization(Observable):
         if lazy:
             self._queue.add(params)
         else:
-            self._space[tag].probe(params)
+            # Points that only differ by rounding (e.g. after a bounds
+            # transformer snapped them) are not worth another evaluation.
+            cached = self._probe_cache.setdefault(
+                self._probe_key(tag, params), {}
+            )
+            if tag not in cached:
+                cached[tag] = self._space[tag].probe(params)
             self.dispatch(Events.OPTIMIZATION_STEP)
 
+    def _probe_key(self, tag, params):
+        """Hashable key of a point, rounded to absorb floating point noise."""
+        x = self._space[tag]._as_array(params)
+        # adding 0.0 folds -0.0 into 0.0, which would otherwise hash apart
+        return (x.round(12) + 0.0).tobytes()
+
+    def _training_data(self):
+        """
+        Stack the observations shared by every tag into a single (X, Y) pair.
+
+        Tags may be registered one after the other, so only the common prefix
+        of observations is used, and it must cover the same points across
+        tags.
+        """
+        n = min(len(self._space[tag]) for tag in self._tags)
+        params = self._space[self._tags[0]].params[:n]
+        for tag in self._tags[1:]:
+            if not np.array_equal(self._space[tag].params[:n], params):
+                raise ValueError(
+                    "Observations must be registered for all tags ({}) at "
+                    "the same points and in the same order.".format(self._tags)
+                )
+        target = np.column_stack(
+            [self._space[tag].target[:n] for tag in self._tags]
+        )
+        return params, target
+
+    def _ensure_gp(self):
+        """
+        Build the internal GP regressor on first use, so optimizers that only
+        ever probe never pay for it.
+
+        The GP has one output column per tag. All tags share the same
+        training points, so a single Cholesky serves every output.
+        """
+        if self._gp is None:
+            self._gp = CachedGaussianProcessRegressor(
+                # Observation noise is covered by the fixed `alpha`, which
+                # keeps the kernel down to the Matern length scale alone.
+                kernel=Matern(nu=2.5, length_scale_bounds=(1e-2, 1e2)),
+                alpha=1e1,
+                normalize_y=True,
+                n_restarts_optimizer=5,
+                random_state=self._random_state,
+                # The large fixed `alpha` keeps K well conditioned, so single
+                # precision is plenty for the GP and halves its memory
+                # traffic.
+                dtype=np.float32,
+            )
+        return self._gp
+
+    def _fit_gp(self, params, target):
+        """
+        Fit the GP, warm starting from the previous kernel hyperparameters.
+
+        Consecutive fits differ by a single observation, so the last fitted
+        theta is close to the new optimum and one local optimization from it
+        is enough. Every `_FULL_FIT_PERIOD` fits the configured random
+        restarts are run as well, so the hyperparameters cannot get stuck in
+        a poor local optimum.
+        """
+        if self._prev_theta is None or self._n_fits % _FULL_FIT_PERIOD == 0:
+            self._gp.fit(params, target)
+        else:
+            # Clone the fitted kernel: the configured one may be None,
+            # sklearn's default.
+            kernel = self._gp.kernel
+            n_restarts_optimizer = self._gp.n_restarts_optimizer
+            self._gp.set_params(
+                kernel=self._gp.kernel_.clone_with_theta(self._prev_theta),
+                n_restarts_optimizer=0,
+            )
+            try:
+                self._gp.fit(params, target)
+            finally:
+                self._gp.set_params(
+                    kernel=kernel, n_restarts_optimizer=n_restarts_optimizer
+                )
+
+        self._prev_theta = self._gp.kernel_.theta
+        self._n_fits += 1
+
     def suggest(self, utility_function):
         """Most promising point to probe next"""
         space = self._space[self._tags[0]]
-        if len(space) == 0:
+        params, target = self._training_data()
+        if len(params) == 0:
             return space.array_to_params(space.random_sample())
 
-        # Sklearn's GP throws a large number of warnings at times, but
-        # we don't really need to see them here.
-        # for tag in self._tags:
-        #     self._gp[tag].fit(self._space[tag].params, self._space[tag].target)
-        # with warnings.catch_warnings():
-        #     warnings.simplefilter("ignore")
-        #     for tag in self._tags:
-        #         self._gp[tag].fit(self._space[tag].params, self._space[tag].target)
-        for tag in self._tags:
-            self._gp[tag].fit(self._space[tag].params, self._space[tag].target)
+        self._ensure_gp()
+        # Observations are only ever appended, so an unchanged count
+        # means the GP is already fitted to the current data.
+        if len(params) != self._last_fit_n:
+            self._fit_gp(params, target)
+            self._last_fit_n = len(params)
 
-        # Finding argmax of the acquisition function.
+        # Finding argmax of the acquisition function. The random warm up only
+        # has to land near the basins L-BFGS-B then refines, so its budget
+        # grows with the dimension instead of being fixed.
         space = self._space[self._tags[0]]
         suggestion = acq_max(
             ac=utility_function,
             gp=self._gp,
             bounds=space.bounds,
             random_state=self._random_state,
+            n_warmup=10 ** min(4, space.dim),
+            n_iter=max(5, 10 * space.dim),
         )
 
         return space.array_to_params(suggestion)
@@ -277,8 +395,7 @@ class ConstrainedBayesianOptimization(Observable):
         self.dispatch(Events.OPTIMIZATION_START)
         self._prime_queue(init_points)
         if gp_params is not None:
-            for tag, params in gp_params.items():
-                self.set_gp_params(tag, **params)
+            self.set_gp_params(**gp_params)
 
 
         util = UtilityFunction(
@@ -316,8 +433,10 @@ class ConstrainedBayesianOptimization(Observable):
         for tag in self._tags:
             self._space[tag].set_bounds(new_bounds)
 
-    def set_gp_params(self, tag, **params):
+    def set_gp_params(self, **params):
         """Set parameters to the internal Gaussian Process Regressor"""
-        self._gp[tag].set_params(**params)
+        self._ensure_gp().set_params(**params)
+        self._last_fit_n = -1
+        self._prev_theta = None
 
 
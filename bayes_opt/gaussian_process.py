@@ -0,0 +1,245 @@
+import warnings
+from operator import itemgetter
+import numpy as np
+from joblib import Parallel, delayed
+from scipy.linalg import solve_triangular
+from scipy.optimize import minimize
+from scipy.spatial.distance import cdist
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.utils import check_random_state
+from sklearn.gaussian_process.kernels import Matern
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _matern52_cross_numpy(X, Y, length_scale):
+    """Matern 5/2 cross-covariance K(X, Y) computed with numpy."""
+    length_scale = np.broadcast_to(length_scale, X.shape[1])
+    d = np.sqrt(5.0) * cdist(X / length_scale, Y / length_scale)
+    return ((1.0 + d + d ** 2 / 3.0) * np.exp(-d)).astype(X.dtype, copy=False)
+
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _matern52_cross(X, Y, length_scale):
+        """Matern 5/2 cross-covariance K(X, Y), parallel over the rows of X."""
+        M, D = X.shape
+        N = Y.shape[0]
+        length_scale = np.broadcast_to(length_scale, (D,))
+        K = np.empty((M, N), dtype=X.dtype)
+        for i in numba.prange(M):
+            for j in range(N):
+                d2 = 0.0
+                for k in range(D):
+                    diff = (X[i, k] - Y[j, k]) / length_scale[k]
+                    d2 += diff * diff
+                d = np.sqrt(5.0 * d2)
+                K[i, j] = (1.0 + d + d * d / 3.0) * np.exp(-d)
+        return K
+else:
+    _matern52_cross = _matern52_cross_numpy
+
+
+def _optimize_theta(optimizer, obj_func, initial_theta, bounds):
+    """
+    One hyperparameter optimization, as GaussianProcessRegressor runs it for
+    `optimizer` (either "fmin_l_bfgs_b" or a callable).
+    """
+    if optimizer == "fmin_l_bfgs_b":
+        res = minimize(
+            obj_func, initial_theta, method="L-BFGS-B", jac=True, bounds=bounds
+        )
+        return res.x, res.fun
+    return optimizer(obj_func, initial_theta, bounds=bounds)
+
+
+class CachedGaussianProcessRegressor(GaussianProcessRegressor):
+    """
+    A GaussianProcessRegressor with a leaner `predict(..., return_std=True)`,
+    which the acquisition optimizer calls thousands of times between two
+    fits.
+
+    The predictive variance comes from a single triangular solve,
+    `v = solve(L, K_trans.T)` and `var = diag(K) - sum(v ** 2)`, against a
+    copy of the Cholesky factor cached by `fit` as `L_predict_`. That solve
+    costs half the flops of a product with the explicit inverse of K, or of
+    the two solves `cho_solve` would run. Calling `fit` again recomputes
+    the cache.
+
+    When the fitted kernel is a plain Matern 5/2, the cross-covariance
+    between test and training points is computed by a fused routine
+    (JIT-compiled with numba when it is installed) instead of sklearn's
+    generic Matern implementation.
+
+    The prediction path runs in the precision of the training inputs: fitting
+    on float32 `X`, or with `dtype=np.float32`, keeps `L_predict_`, `K_trans`
+    and the solve in float32, halving the memory traffic of the dominant
+    operation. The Cholesky factorization done by `fit` itself stays in
+    float64. So that the downcast only rounds away digits the model does not
+    use, `fit` first shifts, in the input precision, the inputs by their
+    per-dimension minimum `X_offset_` (for stationary kernels, which this
+    leaves unchanged) and the targets by their mean `y_offset_` (when
+    `normalize_y` subtracts it anyway). `X_train_` holds the shifted inputs
+    and `predict` applies the same shift to its queries.
+
+    The `n_restarts_optimizer` hyperparameter restarts are independent
+    L-BFGS-B runs on the log marginal likelihood. Setting `n_jobs` to
+    anything but None or 1 runs them as parallel joblib jobs instead of
+    sklearn's sequential loop. The default stays sequential: for the small
+    training sets of BO, starting workers and pickling the estimator to
+    each of them usually costs more than the restarts themselves.
+    """
+
+    def __init__(
+        self,
+        kernel=None,
+        *,
+        alpha=1e-10,
+        optimizer="fmin_l_bfgs_b",
+        n_restarts_optimizer=0,
+        normalize_y=False,
+        copy_X_train=True,
+        random_state=None,
+        n_jobs=None,
+        dtype=None,
+    ):
+        super().__init__(
+            kernel=kernel,
+            alpha=alpha,
+            optimizer=optimizer,
+            n_restarts_optimizer=n_restarts_optimizer,
+            normalize_y=normalize_y,
+            copy_X_train=copy_X_train,
+            random_state=random_state,
+        )
+        self.n_jobs = n_jobs
+        self.dtype = dtype
+
+    def fit(self, X, y):
+        self.L_predict_ = None
+        X, y = np.asarray(X), np.asarray(y)
+        dtype = self.dtype
+        if dtype is None:
+            dtype = np.result_type(X.dtype, np.float32)
+
+        kernel = self.kernel
+        if kernel is None or (kernel.requires_vector_input and
+                              kernel.is_stationary()):
+            self.X_offset_ = X.min(axis=0)
+        else:
+            self.X_offset_ = np.zeros(X.shape[1:], dtype=X.dtype)
+        if self.normalize_y:
+            self.y_offset_ = y.mean(axis=0)
+        else:
+            self.y_offset_ = np.zeros(y.shape[1:], dtype=y.dtype)
+        X = (X - self.X_offset_).astype(dtype, copy=False)
+        y = (y - self.y_offset_).astype(dtype, copy=False)
+
+        if (self.optimizer is None or self.n_restarts_optimizer <= 0 or
+                self.n_jobs in (None, 1)):
+            super().fit(X, y)
+        else:
+            self._fit_parallel_restarts(X, y)
+
+        self.L_predict_ = self.L_.astype(dtype, copy=False)
+        return self
+
+    def _fit_parallel_restarts(self, X, y):
+        """
+        Fit through sklearn with a single call to a custom optimizer, which
+        runs the initial optimization and every restart in parallel and
+        hands back the best result. sklearn then factorizes K only once, for
+        the winning hyperparameters.
+        """
+        optimizer = self.optimizer
+        n_restarts_optimizer = self.n_restarts_optimizer
+        random_state = check_random_state(self.random_state)
+
+        def parallel_optimizer(obj_func, initial_theta, bounds):
+            if not np.isfinite(bounds).all():
+                raise ValueError(
+                    "Multiple optimizer restarts (n_restarts_optimizer>0) "
+                    "requires that all bounds are finite."
+                )
+            initial_thetas = [initial_theta] + [
+                random_state.uniform(bounds[:, 0], bounds[:, 1])
+                for _ in range(n_restarts_optimizer)
+            ]
+            results = Parallel(n_jobs=self.n_jobs)(
+                delayed(_optimize_theta)(optimizer, obj_func, theta, bounds)
+                for theta in initial_thetas
+            )
+            return min(results, key=itemgetter(1))
+
+        self.set_params(optimizer=parallel_optimizer, n_restarts_optimizer=0)
+        try:
+            super().fit(X, y)
+        finally:
+            self.set_params(
+                optimizer=optimizer, n_restarts_optimizer=n_restarts_optimizer
+            )
+
+    def _cross_kernel(self, X):
+        """K(X, X_train_) under the fitted kernel."""
+        kernel = self.kernel_
+        if type(kernel) is Matern and kernel.nu == 2.5:
+            return _matern52_cross(
+                X,
+                np.ascontiguousarray(self.X_train_, dtype=X.dtype),
+                np.atleast_1d(np.asarray(kernel.length_scale, dtype=X.dtype)),
+            )
+        return kernel(X, self.X_train_).astype(X.dtype, copy=False)
+
+    def predict(self, X, return_std=False, return_cov=False):
+        if getattr(self, "L_predict_", None) is None:
+            # unfitted, predict from the prior
+            return super().predict(
+                X, return_std=return_std, return_cov=return_cov
+            )
+
+        dtype = self.L_predict_.dtype
+        X = np.ascontiguousarray(
+            np.atleast_2d(X) - self.X_offset_, dtype=dtype
+        )
+        # 1-d, so the float32 mean is promoted before the offset is added
+        y_offset = np.atleast_1d(self.y_offset_)
+        if not return_std or return_cov:
+            out = super().predict(
+                X, return_std=return_std, return_cov=return_cov
+            )
+            if isinstance(out, tuple):
+                return (out[0] + y_offset,) + out[1:]
+            return out + y_offset
+
+        K_trans = self._cross_kernel(X)
+        y_mean = K_trans @ self.alpha_.astype(dtype, copy=False)
+        # undo normalisation
+        y_mean = self._y_train_std * y_mean + self._y_train_mean
+        if y_mean.ndim > 1 and y_mean.shape[1] == 1:
+            y_mean = np.squeeze(y_mean, axis=1)
+        y_mean = y_mean + y_offset
+
+        y_var = self.kernel_.diag(X).copy()
+        V = solve_triangular(
+            self.L_predict_, K_trans.T, lower=True, check_finite=False
+        )
+        y_var -= np.einsum("ij,ij->j", V, V)
+        # Numerical noise can push some variances slightly below 0.
+        y_var_negative = y_var < 0
+        if np.any(y_var_negative):
+            warnings.warn(
+                "Predicted variances smaller than 0. "
+                "Setting those variances to 0."
+            )
+            y_var[y_var_negative] = 0.0
+
+        # undo normalisation
+        y_var = np.outer(y_var, self._y_train_std ** 2).reshape(
+            *y_var.shape, -1
+        )
+        if y_var.shape[1] == 1:
+            y_var = np.squeeze(y_var, axis=1)
+        return y_mean, np.sqrt(y_var)
@@ -2,6 +2,10 @@ import numpy as np
 from .util import ensure_rng
 
 
+# number of observations the param and target arrays initially have room for
+_INITIAL_CAPACITY = 16
+
+
 def _hashable(x):
     """ ensure that an point is hashable by a python dict """
     return tuple(map(float, x))
@@ -49,9 +53,11 @@ class TargetSpace(object):
             dtype=np.float
         )
 
-        # preallocated memory for X and Y points
-        self._params = np.empty(shape=(0, self.dim))
-        self._target = np.empty(shape=(0))
+        # preallocated memory for X and Y points; only the first `_n` rows
+        # hold observations, the rest is spare capacity
+        self._params = np.empty(shape=(_INITIAL_CAPACITY, self.dim))
+        self._target = np.empty(shape=(_INITIAL_CAPACITY))
+        self._n = 0
 
         # keep track of unique points we have seen so far
         self._cache = {}
@@ -60,8 +66,7 @@ class TargetSpace(object):
         return _hashable(x) in self._cache
 
     def __len__(self):
-        assert len(self._params) == len(self._target)
-        return len(self._target)
+        return self._n
 
     @property
     def empty(self):
@@ -69,11 +74,11 @@ class TargetSpace(object):
 
     @property
     def params(self):
-        return self._params
+        return self._params[:self._n]
 
     @property
     def target(self):
-        return self._target
+        return self._target[:self._n]
 
     @property
     def dim(self):
@@ -163,8 +168,18 @@ class TargetSpace(object):
         # Insert data into unique dictionary
         self._cache[_hashable(x.ravel())] = target
 
-        self._params = np.concatenate([self._params, x.reshape(1, -1)])
-        self._target = np.concatenate([self._target, [target]])
+        # Double the storage when full so appends stay amortized O(1)
+        if self._n == len(self._target):
+            capacity = max(2 * self._n, _INITIAL_CAPACITY)
+            new_params = np.empty(shape=(capacity, self.dim))
+            new_params[:self._n] = self._params[:self._n]
+            new_target = np.empty(shape=(capacity))
+            new_target[:self._n] = self._target[:self._n]
+            self._params, self._target = new_params, new_target
+
+        self._params[self._n] = x
+        self._target[self._n] = target
+        self._n += 1
 
     def probe(self, params):
         """
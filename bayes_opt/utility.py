@@ -1,17 +1,136 @@
+import math
 import warnings
 import numpy as np
 from scipy.stats import norm
 from scipy.optimize import minimize
 from abc import ABC
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _ucb_numpy(mean, std, kappa):
+    return mean + kappa * std
+
+
+def _ei_numpy(mean, std, y_max, xi):
+    a = mean - y_max - xi
+    z = a / std
+    return a * norm.cdf(z) + std * norm.pdf(z)
+
+
+def _poi_numpy(mean, std, y_max, xi):
+    z = (mean - y_max - xi) / std
+    return norm.cdf(z)
+
+
+if numba is not None:
+    # Every fast-math flag except the ones assuming no NaN/inf, since a zero
+    # std legitimately sends `z` to infinity.
+    _FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+    # A single multiply-add is too little work to amortize spinning up
+    # threads, so unlike EI and PoI this kernel stays serial.
+    @numba.njit(fastmath=_FASTMATH, cache=True)
+    def _ucb_kernel(mean, std, kappa):
+        """Fused elementwise `mean + kappa * std`."""
+        m, s = mean.ravel(), std.ravel()
+        out = np.empty(m.size)
+        for i in range(m.size):
+            out[i] = m[i] + kappa * s[i]
+        return out.reshape(mean.shape)
+
+    @numba.njit(parallel=True, fastmath=_FASTMATH, cache=True)
+    def _ei_kernel(mean, std, y_max, xi):
+        """Fused elementwise expected improvement over `y_max`."""
+        m, s = mean.ravel(), std.ravel()
+        out = np.empty(m.size)
+        for i in numba.prange(m.size):
+            a = m[i] - y_max - xi
+            if s[i] > 0.0:
+                z = a / s[i]
+                cdf = 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
+                pdf = math.exp(-0.5 * z * z) / math.sqrt(2.0 * math.pi)
+                out[i] = a * cdf + s[i] * pdf
+            else:
+                out[i] = max(a, 0.0)
+        return out.reshape(mean.shape)
+
+    @numba.njit(parallel=True, fastmath=_FASTMATH, cache=True)
+    def _poi_kernel(mean, std, y_max, xi):
+        """Fused elementwise probability of improving on `y_max`."""
+        m, s = mean.ravel(), std.ravel()
+        out = np.empty(m.size)
+        for i in numba.prange(m.size):
+            a = m[i] - y_max - xi
+            if s[i] > 0.0:
+                out[i] = 0.5 * (1.0 + math.erf(a / s[i] / math.sqrt(2.0)))
+            else:
+                out[i] = 1.0 if a > 0.0 else 0.0
+        return out.reshape(mean.shape)
+else:
+    _ucb_kernel, _ei_kernel, _poi_kernel = _ucb_numpy, _ei_numpy, _poi_numpy
+
+
+def _batched_value_and_grad(ac, gp, x, bounds):
+    """
+    Evaluate the acquisition function and its gradient on a batch of points.
+
+    Each row of `x` is an independent L-BFGS-B restart and `ac` must be
+    point-wise, so the gradient of row `r` only depends on `x[r]`. This lets
+    us estimate every row's gradient with forward differences by perturbing
+    one dimension of all rows at once: `dim + 1` batched GP predictions
+    instead of `n_rows * (dim + 1)` single-point ones.
 
-def acq_max(ac, gp, bounds, random_state, n_warmup=10000, n_iter=10):
+    The step is a fixed fraction of each dimension's width in `bounds`, not
+    of the coordinate's magnitude, so it stays inside a narrow search space
+    far from the origin.
+    """
+    values = ac.utility(x, gp)
+
+    grad = np.empty_like(x)
+    # A GP fitted on float32 data also casts the query points to float32,
+    # after shifting them by its `X_offset_`, so size the step for that
+    # precision (a float64-sized step would round away entirely) and divide
+    # by the step actually seen by the GP.
+    dtype = np.result_type(getattr(gp, "X_train_", x).dtype, np.float32)
+    offset = getattr(gp, "X_offset_", 0.0)
+    lower, upper = bounds[:, 0], bounds[:, 1]
+    step = np.sqrt(np.finfo(dtype).eps) * (upper - lower)
+    # Step backwards where a forward step would leave the search space.
+    step = np.where(x + step > upper, -step, step)
+    x_base = (x - offset).astype(dtype).astype(float)
+    x_moved = (x_base + step).astype(dtype).astype(float)
+    step = x_moved - x_base
+    x_base += offset
+    x_moved += offset
+    for dim in range(x.shape[1]):
+        x_step = x_base.copy()
+        x_step[:, dim] = x_moved[:, dim]
+        grad[:, dim] = (ac.utility(x_step, gp) - values) / step[:, dim]
+
+    return values, grad
+
+
+def acq_max(ac, gp, bounds, random_state, n_warmup=10000, n_iter=10,
+            x_seeds=None):
     """
     A function to find the maximum of the acquisition function
 
     It uses a combination of random sampling (cheap) and the 'L-BFGS-B'
     optimization method. First by sampling `n_warmup` (1e5) points at random,
-    and then running L-BFGS-B from `n_iter` (250) random starting points.
+    and then running L-BFGS-B from the `n_iter` (250) best of those samples.
+    Starting from the most promising samples puts each restart close to a
+    real maximum, so few restarts are needed.
+
+    All L-BFGS-B restarts are stepped together as one separable problem over
+    the stacked `(n_iter, dim)` seeds, so each iteration needs a single
+    batched call to the GP rather than one call per restart. This requires
+    `ac` to be point-wise: the utility of a row may not depend on the other
+    rows evaluated with it, otherwise restarts would leak into each other's
+    gradients and the batch values could not be compared with the warm up.
 
     Parameters
     ----------
@@ -33,44 +152,62 @@ def acq_max(ac, gp, bounds, random_state, n_warmup=10000, n_iter=10):
     :param n_iter:
         number of times to run scipy.minimize
 
+    :param x_seeds:
+        optional (n_restarts, dim) array of L-BFGS-B starting points; when
+        given it replaces the `n_iter` best warm up samples
+
     Returns
     -------
     :return: x_max, The arg max of the acquisition function.
     """
 
+    lower, upper = bounds[:, 0], bounds[:, 1]
+
     # Warm up with random points
     x_tries = random_state.uniform(
-        bounds[:, 0], bounds[:, 1], size=(n_warmup, bounds.shape[0])
+        lower, upper, size=(n_warmup, bounds.shape[0])
     )
     ys = ac.utility(x_tries, gp)
     x_max = x_tries[ys.argmax()]
     max_acq = ys.max()
 
-    # Explore the parameter space more throughly
-    x_seeds = random_state.uniform(
-        bounds[:, 0], bounds[:, 1], size=(n_iter, bounds.shape[0])
-    )
-    for x_try in x_seeds:
-        # Find the minimum of minus the acquisition function
-        res = minimize(
-            lambda x: -ac.utility(x.reshape(1, -1), gp),
-            x_try.reshape(1, -1),
-            bounds=bounds,
-            method="L-BFGS-B",
+    # Explore the parameter space more throughly, starting from the best
+    # warm up samples
+    if x_seeds is None:
+        n_seeds = min(n_iter, n_warmup)
+        x_seeds = x_tries[np.argpartition(-ys, n_seeds - 1)[:n_seeds]]
+    x_seeds = np.atleast_2d(x_seeds)
+    shape = x_seeds.shape
+
+    def neg_acq(x_flat):
+        # Find the minimum of minus the (summed) acquisition function
+        values, grad = _batched_value_and_grad(
+            ac, gp, x_flat.reshape(shape), bounds
         )
+        return -values.sum(), -grad.ravel()
+
+    res = minimize(
+        neg_acq,
+        x_seeds.ravel(),
+        jac=True,
+        bounds=np.tile(bounds, (shape[0], 1)),
+        method="L-BFGS-B",
+    )
 
-        # See if success
-        if not res.success:
-            continue
+    # The restarts share one convergence flag, so rather than discarding all
+    # of them when any one stalls, re-score every final point and keep the
+    # best one.
+    x_opt = np.clip(res.x.reshape(shape), lower, upper)
+    ys = ac.utility(x_opt, gp)
 
-        # Store it if better than previous minimum(maximum).
-        if max_acq is None or -res.fun[0] >= max_acq:
-            x_max = res.x
-            max_acq = -res.fun[0]
+    # Store it if better than previous minimum(maximum).
+    if max_acq is None or ys.max() >= max_acq:
+        x_max = x_opt[ys.argmax()]
+        max_acq = ys.max()
 
     # Clip output to make sure it lies within the bounds. Due to floating
     # point technicalities this is not always the case.
-    return np.clip(x_max, bounds[:, 0], bounds[:, 1])
+    return np.clip(x_max, lower, upper)
 
 
 class AcquisitionFunction(ABC):
@@ -106,7 +243,7 @@ class UpperConfidenceBound(AcquisitionFunction):
             warnings.simplefilter("ignore")
             mean, std = gp.predict(x, return_std=True)
 
-        return mean + self.kappa * std
+        return _ucb_kernel(mean, std, self.kappa)
 
 
 class ExpectedImprovement(AcquisitionFunction):
@@ -119,9 +256,7 @@ class ExpectedImprovement(AcquisitionFunction):
             warnings.simplefilter("ignore")
             mean, std = gp.predict(x, return_std=True)
 
-        a = mean - self._space.target.max() - self._xi
-        z = a / std
-        return a * norm.cdf(z) + std * norm.pdf(z)
+        return _ei_kernel(mean, std, self._space.target.max(), self._xi)
 
 
 class ProbabilityOfImprovement(AcquisitionFunction):
@@ -134,47 +269,74 @@ class ProbabilityOfImprovement(AcquisitionFunction):
             warnings.simplefilter("ignore")
             mean, std = gp.predict(x, return_std=True)
 
-        z = (mean - self._space.target.max() - self._xi) / std
-        return norm.cdf(z)
+        return _poi_kernel(mean, std, self._space.target.max(), self._xi)
 
 
 class ExpectedConstrainedImprovement(AcquisitionFunction):
+    """
+    Expected improvement over the best feasible observation, weighted by the
+    probability that the constraint is satisfied.
+
+    The utility of every point only depends on that point (and on the
+    observations), never on the other points it is evaluated with.
+
+    `min_feasibility_probability` is deprecated and ignored. It is still
+    accepted so that positional arguments keep binding as before.
+    """
+
     def __init__(
         self,
         space,
         threshold,
-        min_feasibility_probability=0.5,
+        min_feasibility_probability=None,
         constraint_tag="constraint",
         objective_tag="objective",
         xi=0.0,
     ):
+        if min_feasibility_probability is not None:
+            warnings.warn(
+                "min_feasibility_probability is deprecated and ignored: the "
+                "incumbent now comes from the feasible observations.",
+                DeprecationWarning,
+                stacklevel=2,
+            )
         self._space = space
         self._threshold = threshold
-        self._min_feasibility_probability = min_feasibility_probability
         self._constraint_tag = constraint_tag
         self._objective_tag = objective_tag
         self._xi = xi
 
+        # the GP is fitted with one output column per tag, in `space` order
+        self._columns = {tag: column for column, tag in enumerate(space)}
+
+    def _incumbent(self):
+        """Best objective among the observations meeting the constraint."""
+        objective = self._space[self._objective_tag].target
+        constraint = self._space[self._constraint_tag].target
+        n = min(len(objective), len(constraint))
+        is_feasible = constraint[:n] <= self._threshold
+        if not np.any(is_feasible):
+            return None
+        return objective[:n][is_feasible].max()
+
     def utility(self, x, gp):
         # TODO add citation
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
-            mean, std = gp[self._constraint_tag].predict(x, return_std=True)
+            means, stds = gp.predict(x, return_std=True)
+            column = self._columns[self._constraint_tag]
+            mean, std = means[:, column], stds[:, column]
             a = mean - self._space[self._constraint_tag].target.max() - self._xi
             pof = norm.cdf(self._threshold, a, np.sqrt(std))
 
-            is_feasible = pof >= self._min_feasibility_probability
-
-            if not np.any(is_feasible):
+            # Until a feasible point is observed, look for feasibility alone.
+            best = self._incumbent()
+            if best is None:
                 return pof
 
-            mean, std = gp[self._objective_tag].predict(x, return_std=True)
-            a = mean - self._space[self._objective_tag].target.max() - self._xi
-            best = a[is_feasible].max()
-            
-            a = mean - best - self._xi
-            z = a / std
-            ei = a * norm.cdf(z) + std * norm.pdf(z)
+            column = self._columns[self._objective_tag]
+            mean, std = means[:, column], stds[:, column]
+            ei = _ei_kernel(mean, std, best, self._xi)
 
         return ei * pof
 
@@ -224,7 +386,7 @@ class UtilityFunction(object):
             warnings.simplefilter("ignore")
             mean, std = gp.predict(x, return_std=True)
 
-        return mean + kappa * std
+        return _ucb_kernel(mean, std, kappa)
 
     @staticmethod
     def _ei(x, gp, y_max, xi):
@@ -232,9 +394,7 @@ class UtilityFunction(object):
             warnings.simplefilter("ignore")
             mean, std = gp.predict(x, return_std=True)
 
-        a = mean - y_max - xi
-        z = a / std
-        return a * norm.cdf(z) + std * norm.pdf(z)
+        return _ei_kernel(mean, std, y_max, xi)
 
     @staticmethod
     def _poi(x, gp, y_max, xi):
@@ -242,8 +402,7 @@ class UtilityFunction(object):
             warnings.simplefilter("ignore")
             mean, std = gp.predict(x, return_std=True)
 
-        z = (mean - y_max - xi) / std
-        return norm.cdf(z)
+        return _poi_kernel(mean, std, y_max, xi)
 
 
 def load_logs(optimizer, logs):
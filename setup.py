@@ -13,7 +13,8 @@ setup(
     install_requires=[
         "numpy >= 1.9.0",
         "scipy >= 0.14.0",
-        "scikit-learn >= 0.18.0",
+        "scikit-learn >= 1.1.0",
+        "joblib >= 1.0.0",
     ],
     classifiers=[
         'License :: OSI Approved :: MIT License',
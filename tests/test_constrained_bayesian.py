@@ -0,0 +1,282 @@
+import pytest
+import numpy as np
+from bayes_opt.constrained_bayesian import ConstrainedBayesianOptimization
+from bayes_opt.utility import ExpectedConstrainedImprovement
+from bayes_opt.utility import acq_max, _batched_value_and_grad
+
+from sklearn.gaussian_process import GaussianProcessRegressor
+
+
+def target_func(**kwargs):
+    # arbitrary target func
+    return sum(kwargs.values())
+
+
+PBOUNDS = {'p1': (0, 10), 'p2': (0, 10)}
+
+
+def get_optimizer(n_points=8):
+    optimizer = ConstrainedBayesianOptimization(
+        target_func, PBOUNDS, random_state=1, verbose=0
+    )
+    random_state = np.random.RandomState(0)
+    for _ in range(n_points):
+        register_point(optimizer, *random_state.uniform(0, 10, size=2))
+    return optimizer
+
+
+def register_point(optimizer, p1, p2):
+    params = {"p1": p1, "p2": p2}
+    optimizer.register("objective", params, -(p1 - 3) ** 2 - (p2 - 6) ** 2)
+    optimizer.register("constraint", params, p1 - p2)
+
+
+def get_acquisition(optimizer):
+    return ExpectedConstrainedImprovement(optimizer.space, threshold=0.0)
+
+
+def test_suggest_within_bounds():
+    optimizer = get_optimizer()
+
+    suggestion = optimizer.suggest(get_acquisition(optimizer))
+    assert set(suggestion) == set(PBOUNDS)
+    for key, (lower, upper) in PBOUNDS.items():
+        assert lower <= suggestion[key] <= upper
+
+
+def test_suggest_skips_refit_without_new_points():
+    optimizer = get_optimizer()
+    acquisition = get_acquisition(optimizer)
+
+    optimizer.suggest(acquisition)
+    fitted = optimizer._gp.L_predict_
+
+    optimizer.suggest(acquisition)
+    assert optimizer._gp.L_predict_ is fitted
+
+    register_point(optimizer, 1.0, 2.0)
+    optimizer.suggest(acquisition)
+    assert optimizer._gp.L_predict_ is not fitted
+    assert len(optimizer._gp.L_predict_) == len(optimizer.space["objective"])
+
+
+def test_suggest_fits_one_gp_for_all_tags():
+    optimizer = get_optimizer()
+    optimizer.suggest(get_acquisition(optimizer))
+
+    assert optimizer._gp.y_train_.shape == (8, 2)
+
+    # only the observations registered for every tag are used
+    optimizer.register("objective", {"p1": 1.0, "p2": 2.0}, 0.0)
+    optimizer.suggest(get_acquisition(optimizer))
+    assert optimizer._gp.y_train_.shape == (8, 2)
+
+
+def test_suggest_with_misaligned_tags():
+    optimizer = ConstrainedBayesianOptimization(
+        target_func, PBOUNDS, random_state=1, verbose=0
+    )
+    optimizer.register("objective", {"p1": 1.0, "p2": 2.0}, 0.0)
+    optimizer.register("constraint", {"p1": 2.0, "p2": 1.0}, 0.0)
+
+    with pytest.raises(ValueError):
+        optimizer.suggest(get_acquisition(optimizer))
+
+
+def test_suggest_warm_starts_gp():
+    optimizer = get_optimizer()
+    acquisition = get_acquisition(optimizer)
+
+    optimizer.suggest(acquisition)
+    n_restarts_optimizer = optimizer._gp.n_restarts_optimizer
+    theta = optimizer._prev_theta
+    np.testing.assert_array_equal(theta, optimizer._gp.kernel_.theta)
+
+    register_point(optimizer, 1.0, 2.0)
+    optimizer.suggest(acquisition)
+    assert optimizer._n_fits == 2
+    # the configured estimator is left untouched by warm starting
+    assert optimizer._gp.n_restarts_optimizer == n_restarts_optimizer
+    assert optimizer._gp.kernel.length_scale == 1.0
+
+    optimizer.set_gp_params(alpha=1.0)
+    assert optimizer._prev_theta is None
+
+    # warm starting also works with sklearn's default kernel
+    optimizer.set_gp_params(kernel=None)
+    optimizer.suggest(acquisition)
+    register_point(optimizer, 2.0, 3.0)
+    optimizer.suggest(acquisition)
+    assert optimizer._gp.kernel is None
+    assert optimizer._prev_theta is not None
+
+
+def test_probe_reuses_cached_targets():
+    calls = []
+
+    def counting_func(**kwargs):
+        calls.append(kwargs)
+        return target_func(**kwargs)
+
+    optimizer = ConstrainedBayesianOptimization(
+        counting_func, PBOUNDS, random_state=1, verbose=0
+    )
+
+    optimizer.probe("objective", {"p1": 1.0, "p2": 2.0}, lazy=False)
+    assert len(calls) == 1
+
+    optimizer.probe("objective", {"p1": 1.0, "p2": 2.0 + 1e-14}, lazy=False)
+    assert len(calls) == 1
+    assert len(optimizer.space["objective"]) == 1
+
+    # every tag is evaluated on its own
+    optimizer.probe("constraint", {"p1": 1.0, "p2": 2.0}, lazy=False)
+    assert len(calls) == 2
+
+    optimizer.register("objective", {"p1": 3.0, "p2": 4.0}, 7.0)
+    optimizer.probe("objective", {"p1": 3.0, "p2": 4.0}, lazy=False)
+    assert len(calls) == 2
+
+
+def test_gp_is_built_lazily():
+    optimizer = get_optimizer()
+    assert optimizer._gp is None
+
+    optimizer.suggest(get_acquisition(optimizer))
+    assert optimizer._gp is not None
+
+    optimizer = get_optimizer()
+    optimizer.set_gp_params(alpha=1.0, n_jobs=1)
+    assert optimizer._gp.alpha == 1.0
+    assert optimizer._gp.n_jobs == 1
+
+
+def test_constrained_improvement_is_pointwise():
+    optimizer = get_optimizer()
+    acquisition = get_acquisition(optimizer)
+    optimizer.suggest(acquisition)
+
+    x = np.random.RandomState(1).uniform(0, 10, size=(5, 2))
+    values = acquisition.utility(x, optimizer._gp)
+
+    # up to float32 round-off in the GP prediction
+    for row in range(len(x)):
+        np.testing.assert_allclose(
+            acquisition.utility(x[row:row + 1], optimizer._gp),
+            values[row:row + 1],
+            rtol=1e-5,
+        )
+
+
+def test_min_feasibility_probability_is_deprecated():
+    optimizer = get_optimizer()
+
+    with pytest.warns(DeprecationWarning):
+        acquisition = ExpectedConstrainedImprovement(
+            optimizer.space, 0.0, 0.5, "constraint", "objective"
+        )
+    assert acquisition._constraint_tag == "constraint"
+    assert acquisition._objective_tag == "objective"
+
+    optimizer.suggest(acquisition)
+
+
+def test_lbfgs_refines_seeds_on_float32_gp():
+    optimizer = get_optimizer()
+    acquisition = get_acquisition(optimizer)
+    optimizer.suggest(acquisition)
+    gp = optimizer._gp
+    bounds = optimizer.space["objective"].bounds
+    assert gp.X_train_.dtype == np.float32
+
+    seeds = np.random.RandomState(2).uniform(0, 10, size=(3, 2))
+    _, grad = _batched_value_and_grad(acquisition, gp, seeds, bounds)
+    assert np.all(grad != 0)
+
+    x_max = acq_max(
+        acquisition,
+        gp,
+        bounds=bounds,
+        random_state=np.random.RandomState(0),
+        n_warmup=1,
+        x_seeds=seeds,
+    )
+    assert not any(np.allclose(x_max, seed) for seed in seeds)
+    assert (acquisition.utility(x_max.reshape(1, -1), gp)[0] >
+            acquisition.utility(seeds, gp).max())
+
+
+def get_far_optimizer():
+    # a narrow search space far from the origin
+    optimizer = ConstrainedBayesianOptimization(
+        target_func, {'p1': (1e6, 1e6 + 1), 'p2': (0, 1)}, random_state=1,
+        verbose=0,
+    )
+    random_state = np.random.RandomState(0)
+    for p1, p2 in random_state.uniform(0, 1, size=(15, 2)):
+        params = {"p1": 1e6 + p1, "p2": p2}
+        optimizer.register("objective", params, 1e6 - (p1 - 0.3) ** 2)
+        optimizer.register("constraint", params, p1 - p2)
+    optimizer.suggest(get_acquisition(optimizer))
+    return optimizer
+
+
+def test_float32_gp_far_from_origin():
+    optimizer = get_far_optimizer()
+    random_state = np.random.RandomState(1)
+
+    gp = optimizer._gp
+    assert gp.X_train_.dtype == np.float32
+    assert len(np.unique(gp.X_train_[:, 0])) == 15
+
+    params, target = optimizer._training_data()
+    reference = GaussianProcessRegressor(
+        kernel=gp.kernel_, alpha=gp.alpha, normalize_y=True, optimizer=None
+    ).fit(params, target)
+    x = np.column_stack([1e6 + random_state.uniform(0, 1, size=20),
+                         random_state.uniform(0, 1, size=20)])
+    np.testing.assert_allclose(gp.predict(x) - 1e6, reference.predict(x) - 1e6,
+                               atol=1e-4)
+
+
+def test_gradient_far_from_origin():
+    optimizer = get_far_optimizer()
+    acquisition = get_acquisition(optimizer)
+    gp = optimizer._gp
+    bounds = optimizer.space["objective"].bounds
+
+    random_state = np.random.RandomState(2)
+    seeds = np.column_stack([1e6 + random_state.uniform(0.1, 0.9, size=3),
+                             random_state.uniform(0.1, 0.9, size=3)])
+    _, grad = _batched_value_and_grad(acquisition, gp, seeds, bounds)
+
+    # central differences with a step much larger than float32 round-off
+    h = 1e-2
+    for dim in range(seeds.shape[1]):
+        x_up, x_down = seeds.copy(), seeds.copy()
+        x_up[:, dim] += h
+        x_down[:, dim] -= h
+        expected = (acquisition.utility(x_up, gp) -
+                    acquisition.utility(x_down, gp)) / (2 * h)
+        np.testing.assert_allclose(grad[:, dim], expected, rtol=0.1,
+                                   atol=1e-3 * np.abs(expected).max())
+
+    x_max = acq_max(
+        acquisition,
+        gp,
+        bounds=bounds,
+        random_state=np.random.RandomState(0),
+        n_warmup=1,
+        x_seeds=seeds,
+    )
+    assert np.all(x_max >= bounds[:, 0]) and np.all(x_max <= bounds[:, 1])
+    assert (acquisition.utility(x_max.reshape(1, -1), gp)[0] >=
+            acquisition.utility(seeds, gp).max())
+
+
+if __name__ == '__main__':
+    r"""
+    CommandLine:
+        python tests/test_constrained_bayesian.py
+    """
+    pytest.main([__file__])
@@ -0,0 +1,138 @@
+import pytest
+import numpy as np
+
+from bayes_opt.gaussian_process import CachedGaussianProcessRegressor
+from bayes_opt.gaussian_process import _matern52_cross, _matern52_cross_numpy
+
+from sklearn.gaussian_process.kernels import Matern
+from sklearn.gaussian_process import GaussianProcessRegressor
+
+
+def get_data(n_targets=1):
+    random_state = np.random.RandomState(0)
+    X = random_state.uniform(0, 1, size=(20, 2))
+    y = np.column_stack([
+        np.sin(3 * X[:, 0]) + (k + 1) * X[:, 1] ** 2 for k in range(n_targets)
+    ])
+    return X, np.squeeze(y), random_state.uniform(0, 1, size=(50, 2))
+
+
+@pytest.mark.parametrize("n_targets", [1, 2])
+def test_predict_matches_sklearn(n_targets):
+    X, y, X_star = get_data(n_targets)
+
+    params = dict(kernel=Matern(nu=2.5), alpha=1e-2, normalize_y=True,
+                  random_state=0)
+    reference = GaussianProcessRegressor(**params).fit(X, y)
+    cached = CachedGaussianProcessRegressor(**params).fit(X, y)
+
+    mean, std = cached.predict(X_star, return_std=True)
+    ref_mean, ref_std = reference.predict(X_star, return_std=True)
+
+    assert mean.shape == ref_mean.shape
+    assert std.shape == ref_std.shape
+    np.testing.assert_allclose(mean, ref_mean, rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(std, ref_std, rtol=1e-5, atol=1e-8)
+
+
+def test_predict_float32():
+    X, y, X_star = get_data()
+
+    params = dict(kernel=Matern(nu=2.5), alpha=1e-1, normalize_y=True,
+                  random_state=0)
+    reference = GaussianProcessRegressor(**params).fit(X, y)
+    cached = CachedGaussianProcessRegressor(**params).fit(
+        X.astype(np.float32), y.astype(np.float32)
+    )
+    assert cached.L_predict_.dtype == np.float32
+
+    mean, std = cached.predict(X_star, return_std=True)
+    ref_mean, ref_std = reference.predict(X_star, return_std=True)
+    np.testing.assert_allclose(mean, ref_mean, rtol=1e-3, atol=1e-4)
+    np.testing.assert_allclose(std, ref_std, rtol=1e-3, atol=1e-4)
+
+
+def test_predict_float32_far_from_origin():
+    X, y, X_star = get_data()
+    X, X_star, y = X + 1e6, X_star + 1e6, y + 1e6
+
+    params = dict(kernel=Matern(nu=2.5), alpha=1e-1, normalize_y=True,
+                  random_state=0)
+    reference = GaussianProcessRegressor(**params).fit(X, y)
+    cached = CachedGaussianProcessRegressor(dtype=np.float32, **params).fit(
+        X, y
+    )
+    assert cached.L_predict_.dtype == np.float32
+    # a plain float32 cast would collapse X onto a 1/16 grid
+    assert len(np.unique(cached.X_train_[:, 0])) == len(X)
+
+    mean, std = cached.predict(X_star, return_std=True)
+    ref_mean, ref_std = reference.predict(X_star, return_std=True)
+    np.testing.assert_allclose(mean - 1e6, ref_mean - 1e6, atol=1e-3)
+    np.testing.assert_allclose(std, ref_std, rtol=1e-3, atol=1e-4)
+
+    mean, cov = cached.predict(X_star[:5], return_cov=True)
+    ref_mean, ref_cov = reference.predict(X_star[:5], return_cov=True)
+    np.testing.assert_allclose(mean - 1e6, ref_mean - 1e6, atol=1e-3)
+    np.testing.assert_allclose(cov, ref_cov, atol=1e-4)
+
+
+@pytest.mark.parametrize("n_jobs", [None, 2])
+def test_fit_restarts_match_sklearn(n_jobs):
+    X, y, _ = get_data()
+
+    params = dict(kernel=Matern(nu=2.5), alpha=1e-2, normalize_y=True,
+                  n_restarts_optimizer=3, random_state=0)
+    reference = GaussianProcessRegressor(**params).fit(X, y)
+    cached = CachedGaussianProcessRegressor(n_jobs=n_jobs, **params)
+    cached.fit(X, y)
+
+    np.testing.assert_allclose(cached.kernel_.theta, reference.kernel_.theta)
+    assert cached.log_marginal_likelihood_value_ == pytest.approx(
+        reference.log_marginal_likelihood_value_
+    )
+    # the configured estimator is left untouched
+    assert cached.get_params() == CachedGaussianProcessRegressor(
+        n_jobs=n_jobs, **params).get_params()
+
+
+def test_n_jobs_is_a_parameter():
+    gp = CachedGaussianProcessRegressor()
+    assert gp.get_params()["n_jobs"] is None
+
+    gp.set_params(n_jobs=2)
+    assert gp.n_jobs == 2
+
+
+def test_refit_invalidates_cache():
+    X, y, _ = get_data()
+    gp = CachedGaussianProcessRegressor(kernel=Matern(nu=2.5), alpha=1e-2)
+
+    gp.fit(X[:10], y[:10])
+    assert gp.L_predict_.shape == (10, 10)
+
+    gp.fit(X, y)
+    assert gp.L_predict_.shape == (20, 20)
+
+
+@pytest.mark.parametrize("length_scale", [[0.5], [0.3, 2.0]])
+def test_matern52_cross(length_scale):
+    X, _, X_star = get_data()
+    kernel = Matern(length_scale=np.squeeze(length_scale), nu=2.5)
+    length_scale = np.asarray(length_scale)
+
+    expected = kernel(X_star, X)
+    np.testing.assert_allclose(
+        _matern52_cross(X_star, X, length_scale), expected, atol=1e-12
+    )
+    np.testing.assert_allclose(
+        _matern52_cross_numpy(X_star, X, length_scale), expected, atol=1e-12
+    )
+
+
+if __name__ == '__main__':
+    r"""
+    CommandLine:
+        python tests/test_gaussian_process.py
+    """
+    pytest.main([__file__])
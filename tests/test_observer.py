@@ -65,6 +65,23 @@ def test_dispatch():
     assert observer_a.counter == 2
 
 
+def test_dispatch_after_unsubscribe():
+    observer_a = SimpleObserver()
+    observer_b = SimpleObserver()
+    observable = Observable(events=EVENTS)
+
+    observable.subscribe("a", observer_a)
+    observable.subscribe("a", observer_b)
+    observable.dispatch('a')
+    assert observer_a.counter == 1
+    assert observer_b.counter == 1
+
+    observable.unsubscribe("a", observer_a)
+    observable.dispatch('a')
+    assert observer_a.counter == 1
+    assert observer_b.counter == 2
+
+
 def test_tracker():
     class MockInstance:
         def __init__(self, max_target=1, max_params=[1, 1]):
@@ -93,6 +93,20 @@ def test_register():
         space.register(params={"p1": 5, "p2": 4}, target=9)
 
 
+def test_register_beyond_capacity():
+    space = TargetSpace(target_func, PBOUNDS)
+
+    points = np.random.RandomState(0).uniform(0, 1, size=(100, 2))
+    for n, (p1, p2) in enumerate(points):
+        space.register(params={"p1": p1, "p2": p2}, target=n)
+
+    assert len(space) == 100
+    assert space.params.shape == (100, 2)
+    assert space.target.shape == (100,)
+    np.testing.assert_array_equal(space.params, points)
+    np.testing.assert_array_equal(space.target, np.arange(100))
+
+
 def test_probe():
     space = TargetSpace(target_func, PBOUNDS)
 
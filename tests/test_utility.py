@@ -0,0 +1,130 @@
+import pytest
+import numpy as np
+
+from bayes_opt.utility import UpperConfidenceBound
+from bayes_opt.utility import acq_max, ensure_rng
+from bayes_opt.utility import _ucb_kernel, _ei_kernel, _poi_kernel
+from bayes_opt.utility import _ucb_numpy, _ei_numpy, _poi_numpy
+
+from sklearn.gaussian_process.kernels import Matern
+from sklearn.gaussian_process import GaussianProcessRegressor
+
+
+def get_globals():
+    X = np.array([
+        [0.00, 0.00],
+        [0.99, 0.99],
+        [0.00, 0.99],
+        [0.99, 0.00],
+        [0.50, 0.50],
+        [0.25, 0.50],
+        [0.50, 0.25],
+        [0.75, 0.50],
+        [0.50, 0.75],
+    ])
+
+    def get_y(X):
+        return -(X[:, 0] - 0.3) ** 2 - 0.5 * (X[:, 1] - 0.6)**2 + 2
+    y = get_y(X)
+
+    mesh = np.dstack(
+        np.meshgrid(np.arange(0, 1, 0.005), np.arange(0, 1, 0.005))
+    ).reshape(-1, 2)
+
+    GP = GaussianProcessRegressor(
+        kernel=Matern(),
+        n_restarts_optimizer=25,
+    )
+    GP.fit(X, y)
+
+    return {'x': X, 'y': y, 'gp': GP, 'mesh': mesh}
+
+
+GLOB = get_globals()
+X, Y, GP, MESH = GLOB['x'], GLOB['y'], GLOB['gp'], GLOB['mesh']
+BOUNDS = np.array([[0, 1], [0, 1]], dtype=float)
+
+
+def brute_force_maximum(MESH, GP, util):
+    mesh_vals = util.utility(MESH, GP)
+    return MESH[np.argmax(mesh_vals)]
+
+
+def test_acq_with_ucb():
+    util = UpperConfidenceBound(kappa=1.0, xi=0.0)
+    episilon = 1e-2
+
+    max_arg = acq_max(
+        util,
+        GP,
+        bounds=BOUNDS,
+        random_state=ensure_rng(0),
+        n_iter=20
+    )
+
+    assert all(abs(brute_force_maximum(MESH, GP, util) - max_arg) < episilon)
+
+
+def test_acq_from_best_warmup_samples():
+    util = UpperConfidenceBound(kappa=1.0, xi=0.0)
+    episilon = 1e-2
+
+    # a single restart is enough when it starts from the best sample
+    max_arg = acq_max(
+        util,
+        GP,
+        bounds=BOUNDS,
+        random_state=ensure_rng(0),
+        n_warmup=1000,
+        n_iter=1,
+    )
+
+    assert all(abs(brute_force_maximum(MESH, GP, util) - max_arg) < episilon)
+
+
+def test_acq_with_seeds():
+    util = UpperConfidenceBound(kappa=1.0, xi=0.0)
+    episilon = 1e-2
+
+    max_arg = acq_max(
+        util,
+        GP,
+        bounds=BOUNDS,
+        random_state=ensure_rng(0),
+        n_warmup=1,
+        x_seeds=np.array([[0.1, 0.1], [0.9, 0.9], [0.1, 0.9]]),
+    )
+
+    assert all(abs(brute_force_maximum(MESH, GP, util) - max_arg) < episilon)
+    assert all(max_arg >= BOUNDS[:, 0]) and all(max_arg <= BOUNDS[:, 1])
+
+
+def test_acquisition_kernels():
+    random_state = ensure_rng(0)
+    mean = random_state.normal(size=(100,))
+    std = random_state.uniform(0.1, 2.0, size=(100,))
+
+    np.testing.assert_allclose(
+        _ucb_kernel(mean, std, 2.5), _ucb_numpy(mean, std, 2.5)
+    )
+    np.testing.assert_allclose(
+        _ei_kernel(mean, std, 0.5, 0.1), _ei_numpy(mean, std, 0.5, 0.1),
+        atol=1e-12,
+    )
+    np.testing.assert_allclose(
+        _poi_kernel(mean, std, 0.5, 0.1), _poi_numpy(mean, std, 0.5, 0.1),
+        atol=1e-12,
+    )
+
+    # a zero std means the improvement is known exactly
+    mean, std = np.array([1.0, -1.0]), np.zeros(2)
+    np.testing.assert_allclose(_ei_kernel(mean, std, 0.0, 0.0), [1.0, 0.0])
+    np.testing.assert_allclose(_poi_kernel(mean, std, 0.0, 0.0), [1.0, 0.0])
+
+
+if __name__ == '__main__':
+    r"""
+    CommandLine:
+        python tests/test_utility.py
+    """
+    pytest.main([__file__])